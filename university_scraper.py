@@ -1,19 +1,32 @@
-import json
 import random
 import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
 
-import openpyxl  # noqa: F401 - required by pandas Excel writer engine
+import orjson
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
+from lxml import etree as lxml_etree
+from lxml import html as lxml_html
+from openpyxl import Workbook
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser
+from urllib3.util.retry import Retry
 
 
 BASE_URL = "https://www.topuniversities.com"
 OUTPUT_FILE = "university_courses.xlsx"
 MIN_COURSES_PER_UNIVERSITY = 5
 TARGET_COUNTRY = "India"
+UNIVERSITY_WORKERS = 4
+COURSE_WORKERS = 5
+MAX_REQUESTS_PER_HOST = 4
+MIN_HOST_INTERVAL = 1.3
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -51,18 +64,6 @@ UNIVERSITY_TARGETS = [
     },
 ]
 
-ALLOWED_LEVEL_SEGMENTS = {
-    "undergrad",
-    "bachelors",
-    "masters",
-    "phd",
-    "postgrad",
-    "mba",
-    "diploma",
-    "cert",
-    "foundation",
-}
-
 LEVEL_BY_SEGMENT = {
     "undergrad": "Bachelor",
     "bachelors": "Bachelor",
@@ -75,6 +76,23 @@ LEVEL_BY_SEGMENT = {
     "foundation": "Foundation",
 }
 
+ALLOWED_LEVEL_SEGMENTS = frozenset(LEVEL_BY_SEGMENT)
+
+# Checked in order against the lowercased study level; the first match wins.
+LEVEL_KEYWORDS = (
+    (("undergraduate", "bachelor"), "Bachelor"),
+    (("postgraduate", "master"), "Master"),
+    (("phd", "doctoral"), "PhD"),
+    (("diploma",), "Diploma"),
+    (("certificate",), "Certificate"),
+    (("mba",), "MBA"),
+)
+
+UNIVERSITY_COLUMNS = ["university_id", "university_name", "country", "city", "website"]
+COURSE_COLUMNS = ["university_id", "course_name", "level", "discipline", "duration", "fees", "eligibility"]
+
+ELIGIBILITY_HEADING_KEYWORDS = ("admission", "eligibility", "entry requirement")
+
 COUNTRY_ALIASES = {
     "Us": "United States",
     "U.S.": "United States",
@@ -83,20 +101,60 @@ COUNTRY_ALIASES = {
     "England": "United Kingdom",
 }
 
+WHITESPACE_RE = re.compile(r"\s+")
+CITATION_RE = re.compile(r"\[[^\]]*\]")
+DIGIT_RE = re.compile(r"\d")
+COMPASS_RE = re.compile(r"\b[NSWE]\b")
+COURSE_PREFIX_RE = re.compile(
+    r"^(Bachelor|Master|BA|BSc|MSc|MA|PhD|Doctor of|Diploma in)\s*(of|in)?\s*",
+    re.IGNORECASE,
+)
+
+UTF8_HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+
+# Rows of the first infobox table that carry both a label and a value cell.
+INFOBOX_ROWS_XPATH = (
+    "(//table[contains(concat(' ', normalize-space(@class), ' '), ' infobox ')])[1]//tr[th and td]"
+)
+
+
+_host_slots = {}
+_host_next_request = {}
+_host_lock = threading.Lock()
 
-def polite_delay(low=0.8, high=1.8):
-    time.sleep(random.uniform(low, high))
+
+def host_slot(host):
+    with _host_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
+        return _host_slots[host]
+
+
+def polite_delay(host, jitter=0.5):
+    # Space requests to the same host; requests to a different host do not wait on each other.
+    with _host_lock:
+        now = time.monotonic()
+        earliest = _host_next_request.get(host, now)
+        start = max(now, earliest)
+        _host_next_request[host] = start + MIN_HOST_INTERVAL + random.uniform(0, jitter)
+    if start > now:
+        time.sleep(start - now)
+
+
+@lru_cache(maxsize=4096)
+def _clean_str(text):
+    text = WHITESPACE_RE.sub(" ", text).strip()
+    return text if text else "N/A"
 
 
 def clean_text(value):
     if value is None:
         return "N/A"
-    text = re.sub(r"\s+", " ", str(value)).strip()
-    return text if text else "N/A"
+    return _clean_str(str(value))
 
 
-def smart_title_case(text):
-    text = clean_text(text)
+@lru_cache(maxsize=4096)
+def _smart_title_case(text):
     if text == "N/A":
         return text
 
@@ -113,6 +171,11 @@ def smart_title_case(text):
     return COUNTRY_ALIASES.get(titled, titled)
 
 
+def smart_title_case(text):
+    # Cleaning first keeps the cache keyed on normalized strings whatever type the caller passes.
+    return _smart_title_case(clean_text(text))
+
+
 def build_headers():
     return {
         "User-Agent": random.choice(USER_AGENTS),
@@ -120,29 +183,54 @@ def build_headers():
     }
 
 
-def fetch_html(session, url, retries=3, timeout=30):
-    for attempt in range(1, retries + 1):
-        try:
-            polite_delay()
+def build_session():
+    session = requests.Session()
+    # Pool sized for the university and course workers; urllib3 retries transient failures with backoff.
+    adapter = HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def decode_body(response):
+    # Use the charset from Content-Type when one is declared. Otherwise default to UTF-8: for text/html
+    # without a charset, response.text would decode as ISO-8859-1 and garble UTF-8 pages.
+    content_type = response.headers.get("Content-Type", "").lower()
+    encoding = response.encoding if "charset=" in content_type and response.encoding else "utf-8"
+    try:
+        return response.content.decode(encoding, errors="replace")
+    except LookupError:
+        return response.content.decode("utf-8", errors="replace")
+
+
+def fetch_html(session, url, timeout=30):
+    try:
+        host = urlparse(url).netloc
+        with host_slot(host):
+            polite_delay(host)
             response = session.get(url, headers=build_headers(), timeout=timeout)
-            if response.status_code == 200:
-                return response.text
-            print(f"  Request failed ({response.status_code}) for {url} [attempt {attempt}/{retries}]")
-        except requests.RequestException as exc:
-            print(f"  Request error for {url}: {exc} [attempt {attempt}/{retries}]")
-        time.sleep(0.6 * attempt)
-    return None
+    except requests.RequestException as exc:
+        print(f"  Request error for {url}: {exc}")
+        return None
+    if response.status_code != 200:
+        print(f"  Request failed ({response.status_code}) for {url}")
+        return None
+    return decode_body(response)
 
 
 def parse_jsonld_objects(soup):
     objects = []
-    for script_tag in soup.select('script[type="application/ld+json"]'):
+    for script_tag in soup.find_all("script", type="application/ld+json"):
         raw = script_tag.get_text(strip=True)
         if not raw:
             continue
         try:
-            parsed = json.loads(raw)
-        except json.JSONDecodeError:
+            parsed = orjson.loads(raw)
+        except orjson.JSONDecodeError:
             continue
         if isinstance(parsed, list):
             objects.extend(parsed)
@@ -151,34 +239,36 @@ def parse_jsonld_objects(soup):
     return objects
 
 
-def extract_city_country_from_wikipedia(soup):
-    infobox = soup.select_one("table.infobox")
-    if not infobox:
-        return "N/A", "N/A"
+def parse_lxml_tree(html):
+    # lxml refuses str input carrying an XML encoding declaration; re-parse as UTF-8 bytes with the
+    # encoding pinned, since the text is already decoded. Empty documents yield None.
+    try:
+        try:
+            return lxml_html.fromstring(html)
+        except ValueError:
+            return lxml_html.fromstring(html.encode("utf-8"), parser=UTF8_HTML_PARSER)
+    except lxml_etree.ParserError:
+        return None
+
+
+def node_text(node):
+    # Mirrors get_text(" ", strip=True) while skipping inline <style>/<script> blocks.
+    return clean_text(" ".join(node.xpath(".//text()[not(ancestor::style) and not(ancestor::script)]")))
 
-    location_raw = "N/A"
-    for row in infobox.select("tr"):
-        header = row.find("th")
-        cell = row.find("td")
-        if not header or not cell:
-            continue
-        label = clean_text(header.get_text(" ", strip=True)).lower()
-        if label in {"location", "address"}:
-            location_raw = clean_text(cell.get_text(" ", strip=True))
-            break
 
+def split_wiki_location(location_raw):
     if location_raw == "N/A":
         return "N/A", "N/A"
 
-    cleaned = re.sub(r"\[[^\]]*\]", "", location_raw)
+    cleaned = CITATION_RE.sub("", location_raw)
     parts = [clean_text(p) for p in cleaned.split(",")]
     filtered_parts = []
     for part in parts:
         if part == "N/A":
             continue
-        if re.search(r"\d", part):
+        if DIGIT_RE.search(part):
             continue
-        if re.search(r"\b[NSWE]\b", part):
+        if COMPASS_RE.search(part):
             continue
         filtered_parts.append(part)
 
@@ -197,38 +287,45 @@ def extract_website_from_wikipedia(session, wiki_url):
     if not wiki_html:
         return "N/A", "N/A", "N/A", "N/A"
 
-    soup = BeautifulSoup(wiki_html, "html.parser")
-    heading = soup.select_one("#firstHeading")
-    wiki_name = clean_text(heading.get_text(" ", strip=True)) if heading else "N/A"
+    tree = parse_lxml_tree(wiki_html)
+    if tree is None:
+        return "N/A", "N/A", "N/A", "N/A"
 
-    city, country = extract_city_country_from_wikipedia(soup)
-    website = "N/A"
-    infobox = soup.select_one("table.infobox")
-    if infobox:
-        for row in infobox.select("tr"):
-            header = row.find("th")
-            cell = row.find("td")
-            if not header or not cell:
-                continue
-            label = clean_text(header.get_text(" ", strip=True)).lower()
-            if label == "website":
-                link = cell.find("a", href=True)
-                if link:
-                    href = clean_text(link["href"])
-                    if href.startswith("//"):
-                        href = "https:" + href
-                    elif href.startswith("/"):
-                        href = "https://en.wikipedia.org" + href
-                    website = href
-                else:
-                    website = clean_text(cell.get_text(" ", strip=True))
+    heading = tree.xpath('//*[@id="firstHeading"]')
+    wiki_name = node_text(heading[0]) if heading else "N/A"
+
+    # Collect the first location/address and website cells in a single pass over the infobox.
+    cells = {}
+    for row in tree.xpath(INFOBOX_ROWS_XPATH):
+        label = node_text(row.xpath("th")[0]).lower()
+        key = "location" if label in {"location", "address"} else label
+        if key in {"location", "website"} and key not in cells:
+            cells[key] = row.xpath("td")[0]
+            if len(cells) == 2:
                 break
 
+    location_raw = node_text(cells["location"]) if "location" in cells else "N/A"
+    city, country = split_wiki_location(location_raw)
+
+    website = "N/A"
+    if "website" in cells:
+        cell = cells["website"]
+        hrefs = cell.xpath(".//a/@href")
+        if hrefs:
+            href = clean_text(hrefs[0])
+            if href.startswith("//"):
+                href = "https:" + href
+            elif href.startswith("/"):
+                href = "https://en.wikipedia.org" + href
+            website = href
+        else:
+            website = node_text(cell)
+
     return wiki_name, city, country, website
 
 
 def extract_university_meta_from_topuniversities(html):
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     jsonld_objects = parse_jsonld_objects(soup)
 
     university_name = "N/A"
@@ -272,18 +369,17 @@ def extract_university_meta_from_topuniversities(html):
 
 
 def extract_program_links(university_html, slug):
-    soup = BeautifulSoup(university_html, "html.parser")
+    tree = parse_lxml_tree(university_html)
+    if tree is None:
+        return []
+
     links = []
     seen = set()
 
-    for anchor in soup.select("a[href]"):
-        href = clean_text(anchor.get("href"))
-        if href == "N/A":
-            continue
-        href = href.split("?")[0].split("#")[0].strip()
-        if not href.startswith(f"/universities/{slug}/"):
-            continue
-
+    # Let libxml2 narrow the anchors to this university's pages before any Python-side filtering.
+    prefix = f"/universities/{slug}/"
+    for href in tree.xpath("//a[starts-with(normalize-space(@href), $prefix)]/@href", prefix=prefix):
+        href = href.strip().split("?")[0].split("#")[0]
         parts = href.strip("/").split("/")
         if len(parts) < 4:
             continue
@@ -300,45 +396,50 @@ def extract_program_links(university_html, slug):
     return links
 
 
-def extract_badges(soup):
+def lexbor_text(node):
+    return clean_text(node.text(separator=" ", strip=True))
+
+
+def extract_badges(tree):
     badges = {}
-    for badge in soup.select("div.single-badge"):
-        title_tag = badge.select_one("span.single-badge-title")
-        value_tag = badge.select_one("div.badge-description h3")
+    for badge in tree.css("div.single-badge"):
+        title_tag = badge.css_first("span.single-badge-title")
+        value_tag = badge.css_first("div.badge-description h3")
         if not title_tag or not value_tag:
             continue
 
-        title = clean_text(title_tag.get_text(" ", strip=True))
-        value = clean_text(value_tag.get_text(" ", strip=True))
-        if value != "N/A" and title != "N/A" and value.lower().endswith(title.lower()):
+        title = lexbor_text(title_tag)
+        value = lexbor_text(value_tag)
+        title_key = title.lower()
+        if value != "N/A" and title != "N/A" and value.lower().endswith(title_key):
             value = clean_text(value[: -len(title)])
 
-        badges[title.lower()] = value
+        badges[title_key] = value
 
     return badges
 
 
-def extract_highlights(soup):
+def extract_highlights(tree):
     highlights = {}
-    for block in soup.select("div.prog-view-highli"):
-        key_tag = block.find("h3")
-        value_tag = block.find("p")
+    for block in tree.css("div.prog-view-highli"):
+        key_tag = block.css_first("h3")
+        value_tag = block.css_first("p")
         if not key_tag or not value_tag:
             continue
-        key = clean_text(key_tag.get_text(" ", strip=True)).lower()
-        value = clean_text(value_tag.get_text(" ", strip=True))
+        key = lexbor_text(key_tag).lower()
+        value = lexbor_text(value_tag)
         if key and key not in highlights and value != "N/A":
             highlights[key] = value
     return highlights
 
 
-def extract_eligibility(soup):
+def extract_eligibility(tree):
     pairs = []
-    for block in soup.select("div.univ-entry"):
-        label_tag = block.select_one(".univ-entry-label")
-        value_tag = block.select_one(".univ-entry-value")
-        label = clean_text(label_tag.get_text(" ", strip=True)) if label_tag else "N/A"
-        value = clean_text(value_tag.get_text(" ", strip=True)) if value_tag else "N/A"
+    for block in tree.css("div.univ-entry"):
+        label_tag = block.css_first(".univ-entry-label")
+        value_tag = block.css_first(".univ-entry-value")
+        label = lexbor_text(label_tag) if label_tag else "N/A"
+        value = lexbor_text(value_tag) if value_tag else "N/A"
         if label != "N/A" and value != "N/A":
             pairs.append(f"{label}: {value}")
         if len(pairs) >= 5:
@@ -347,19 +448,29 @@ def extract_eligibility(soup):
     if pairs:
         return "; ".join(pairs)
 
-    for heading in soup.find_all(["h2", "h3", "h4"]):
-        heading_text = clean_text(heading.get_text(" ", strip=True)).lower()
-        if "admission" in heading_text or "eligibility" in heading_text or "entry requirement" in heading_text:
-            candidate = heading.find_next(["p", "li", "div"])
+    # Document-order walk: for each matching heading, take the next p/li/div after it.
+    nodes = [node for node in tree.root.traverse() if node.tag in {"h2", "h3", "h4", "p", "li", "div"}]
+    for i, heading in enumerate(nodes):
+        if heading.tag not in {"h2", "h3", "h4"}:
+            continue
+        heading_text = lexbor_text(heading).lower()
+        if any(keyword in heading_text for keyword in ELIGIBILITY_HEADING_KEYWORDS):
+            candidate = next((node for node in nodes[i + 1 :] if node.tag in {"p", "li", "div"}), None)
             if candidate:
-                snippet = clean_text(candidate.get_text(" ", strip=True))
+                snippet = lexbor_text(candidate)
                 if snippet != "N/A":
                     return snippet[:220]
     return "N/A"
 
 
+@lru_cache(maxsize=1024)
+def url_path_parts(url):
+    return tuple(urlparse(url).path.strip("/").split("/"))
+
+
+@lru_cache(maxsize=1024)
 def url_level_segment(course_url):
-    path_parts = urlparse(course_url).path.strip("/").split("/")
+    path_parts = url_path_parts(course_url)
     if len(path_parts) >= 3:
         return path_parts[2].lower()
     return ""
@@ -367,18 +478,9 @@ def url_level_segment(course_url):
 
 def normalize_level(raw_level, course_url):
     value = clean_text(raw_level).lower()
-    if "undergraduate" in value or "bachelor" in value:
-        return "Bachelor"
-    if "postgraduate" in value or "master" in value:
-        return "Master"
-    if "phd" in value or "doctoral" in value:
-        return "PhD"
-    if "diploma" in value:
-        return "Diploma"
-    if "certificate" in value:
-        return "Certificate"
-    if "mba" in value:
-        return "MBA"
+    for keywords, level in LEVEL_KEYWORDS:
+        if any(keyword in value for keyword in keywords):
+            return level
 
     return LEVEL_BY_SEGMENT.get(url_level_segment(course_url), "N/A")
 
@@ -386,16 +488,11 @@ def normalize_level(raw_level, course_url):
 def guess_discipline(course_name, course_url):
     course_name = clean_text(course_name)
     if course_name != "N/A":
-        possible = re.sub(
-            r"^(Bachelor|Master|BA|BSc|MSc|MA|PhD|Doctor of|Diploma in)\s*(of|in)?\s*",
-            "",
-            course_name,
-            flags=re.IGNORECASE,
-        ).strip()
+        possible = COURSE_PREFIX_RE.sub("", course_name).strip()
         if possible and len(possible.split()) <= 6:
             return smart_title_case(possible)
 
-    slug = clean_text(course_url.rstrip("/").split("/")[-1]).replace("-", " ")
+    slug = clean_text(url_path_parts(course_url)[-1]).replace("-", " ")
     return smart_title_case(slug)
 
 
@@ -404,12 +501,14 @@ def scrape_course(session, course_url, university_id):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
-    heading = soup.find("h1")
-    course_name = clean_text(heading.get_text(" ", strip=True)) if heading else "N/A"
+    tree = LexborHTMLParser(html)
+    # selectolax's text() includes <script>/<style> contents, unlike BeautifulSoup's get_text().
+    tree.strip_tags(["script", "style"])
+    heading = tree.css_first("h1")
+    course_name = lexbor_text(heading) if heading else "N/A"
 
-    badges = extract_badges(soup)
-    highlights = extract_highlights(soup)
+    badges = extract_badges(tree)
+    highlights = extract_highlights(tree)
 
     level = normalize_level(highlights.get("study level", "N/A"), course_url)
     discipline = clean_text(
@@ -419,7 +518,7 @@ def scrape_course(session, course_url, university_id):
     )
     duration = clean_text(badges.get("programme duration") or badges.get("duration"))
     fees = clean_text(badges.get("tuition fee/year") or badges.get("tuition fee"))
-    eligibility = clean_text(extract_eligibility(soup))
+    eligibility = clean_text(extract_eligibility(tree))
 
     return {
         "university_id": university_id,
@@ -432,20 +531,26 @@ def scrape_course(session, course_url, university_id):
     }
 
 
+def clean_text_columns(df, columns):
+    # Vectorized equivalent of applying clean_text to every cell of the given columns.
+    df[columns] = df[columns].astype(str).apply(
+        lambda col: col.str.replace(WHITESPACE_RE, " ", regex=True).str.strip().replace("", "N/A")
+    )
+
+
 def clean_universities(universities):
     df = pd.DataFrame(universities)
     if df.empty:
         return df
 
-    for col in ["university_id", "university_name", "country", "city", "website"]:
-        df[col] = df[col].astype(str).apply(clean_text)
+    clean_text_columns(df, UNIVERSITY_COLUMNS)
 
-    df["country"] = df["country"].apply(smart_title_case)
-    df["city"] = df["city"].apply(smart_title_case)
-    df["website"] = df["website"].apply(lambda x: x if x.startswith("http") else "N/A")
+    df["country"] = df["country"].map(smart_title_case)
+    df["city"] = df["city"].map(smart_title_case)
+    df["website"] = df["website"].where(df["website"].str.startswith("http"), "N/A")
 
     df = df.drop_duplicates(subset=["university_name", "country", "city"], keep="first")
-    return df[["university_id", "university_name", "country", "city", "website"]]
+    return df[UNIVERSITY_COLUMNS]
 
 
 def clean_courses(courses):
@@ -453,84 +558,92 @@ def clean_courses(courses):
     if df.empty:
         return df
 
-    for col in ["university_id", "course_name", "level", "discipline", "duration", "fees", "eligibility"]:
-        df[col] = df[col].astype(str).apply(clean_text)
+    clean_text_columns(df, COURSE_COLUMNS)
 
-    df["discipline"] = df["discipline"].apply(smart_title_case)
+    df["discipline"] = df["discipline"].map(smart_title_case)
 
-    df = df.drop_duplicates(subset=["university_id", "course_name", "level"], keep="first").reset_index(drop=True)
-    df.insert(0, "course_id", [f"C{i + 1:04d}" for i in range(len(df))])
-    return df[
-        [
-            "course_id",
-            "university_id",
-            "course_name",
-            "level",
-            "discipline",
-            "duration",
-            "fees",
-            "eligibility",
-        ]
-    ]
+    df = df.drop_duplicates(subset=["university_id", "course_name", "level"], keep="first")
+    return df[COURSE_COLUMNS]
 
 
-def export_to_excel(universities_df, courses_df, output_path=OUTPUT_FILE):
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-        universities_df.to_excel(writer, sheet_name="Universities", index=False)
-        courses_df.to_excel(writer, sheet_name="Courses", index=False)
+def assign_course_ids(courses_df):
+    courses_df = courses_df.reset_index(drop=True)
+    courses_df.insert(0, "course_id", [f"C{i + 1:04d}" for i in range(len(courses_df))])
+    return courses_df
 
 
-def main():
-    print(f"Starting university and course scraping pipeline for {TARGET_COUNTRY}...")
-    session = requests.Session()
-
-    universities = []
-    courses = []
-    global_course_keys = set()
-
-    for idx, target in enumerate(UNIVERSITY_TARGETS, start=1):
-        university_id = f"U{idx:03d}"
-        slug = target["slug"]
-        topuni_url = f"{BASE_URL}/universities/{slug}"
-        print(f"\nScraping university {idx}/{len(UNIVERSITY_TARGETS)}: {slug}")
-
-        university_html = fetch_html(session, topuni_url)
-        if not university_html:
-            print(f"  Skipping {slug}: unable to fetch university page.")
-            continue
-
-        topuni_name, topuni_city, topuni_country = extract_university_meta_from_topuniversities(university_html)
-        wiki_name, wiki_city, wiki_country, website = extract_website_from_wikipedia(session, target["wiki_url"])
-
-        university_name = topuni_name if topuni_name != "N/A" else wiki_name
-        city = topuni_city if topuni_city != "N/A" else wiki_city
-        country = topuni_country if topuni_country != "N/A" else wiki_country
-        normalized_country = smart_title_case(country)
+def export_to_excel(universities_df, courses_df, output_path=OUTPUT_FILE):
+    # Write-only workbooks stream rows to disk instead of holding every cell in memory.
+    workbook = Workbook(write_only=True)
+    for sheet_name, df in (("Universities", universities_df), ("Courses", courses_df)):
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append(list(df.columns))
+        for row in df.itertuples(index=False, name=None):
+            worksheet.append(list(row))
+    workbook.save(output_path)
+
+
+def process_university(session, idx, target):
+    university_id = f"U{idx:03d}"
+    slug = target["slug"]
+    topuni_url = f"{BASE_URL}/universities/{slug}"
+    print(f"\nScraping university {idx}/{len(UNIVERSITY_TARGETS)}: {slug}")
+
+    university_html = fetch_html(session, topuni_url)
+    if not university_html:
+        print(f"  Skipping {slug}: unable to fetch university page.")
+        return None, []
+
+    topuni_name, topuni_city, topuni_country = extract_university_meta_from_topuniversities(university_html)
+
+    # A country already resolved from TopUniversities can rule the university out without a Wikipedia fetch.
+    if topuni_country != "N/A" and smart_title_case(topuni_country) != TARGET_COUNTRY:
+        print(f"  Skipping {slug}: country resolved as {smart_title_case(topuni_country)}.")
+        return None, []
+
+    wiki_name, wiki_city, wiki_country, website = extract_website_from_wikipedia(session, target["wiki_url"])
+
+    university_name = topuni_name if topuni_name != "N/A" else wiki_name
+    city = topuni_city if topuni_city != "N/A" else wiki_city
+    country = topuni_country if topuni_country != "N/A" else wiki_country
+    normalized_country = smart_title_case(country)
+
+    if normalized_country != TARGET_COUNTRY:
+        print(f"  Skipping {slug}: country resolved as {normalized_country}.")
+        return None, []
+
+    university_record = {
+        "university_id": university_id,
+        "university_name": clean_text(university_name),
+        "country": normalized_country,
+        "city": smart_title_case(city),
+        "website": clean_text(website),
+    }
+    print(f"  University captured: {university_record['university_name']} ({university_record['country']})")
 
-        if normalized_country != TARGET_COUNTRY:
-            print(f"  Skipping {slug}: country resolved as {normalized_country}.")
-            continue
+    program_links = extract_program_links(university_html, slug)
+    print(f"  Program links discovered: {len(program_links)} ({slug})")
 
-        university_record = {
-            "university_id": university_id,
-            "university_name": clean_text(university_name),
-            "country": normalized_country,
-            "city": smart_title_case(city),
-            "website": clean_text(website),
-        }
-        universities.append(university_record)
-        print(f"  University captured: {university_record['university_name']} ({university_record['country']})")
-
-        program_links = extract_program_links(university_html, slug)
-        print(f"  Program links discovered: {len(program_links)}")
-
-        collected = 0
-        for program_url in program_links:
-            if collected >= MIN_COURSES_PER_UNIVERSITY:
+    courses = []
+    course_keys = set()
+    pending = deque()
+    remaining_links = iter(program_links)
+    with ThreadPoolExecutor(max_workers=COURSE_WORKERS) as executor:
+        # Keep only as many fetches in flight as could still be needed, and consume them
+        # in link order so the same courses are kept regardless of which request finishes first.
+        while True:
+            while len(pending) < COURSE_WORKERS and len(courses) + len(pending) < MIN_COURSES_PER_UNIVERSITY:
+                program_url = next(remaining_links, None)
+                if program_url is None:
+                    break
+                pending.append((program_url, executor.submit(scrape_course, session, program_url, university_id)))
+
+            if not pending:
                 break
 
+            program_url, future = pending.popleft()
             try:
-                course = scrape_course(session, program_url, university_id)
+                course = future.result()
             except Exception as exc:
                 print(f"  Failed to parse course page {program_url}: {exc}")
                 continue
@@ -543,18 +656,42 @@ def main():
                 course["course_name"].lower(),
                 course["level"].lower(),
             )
-            if dedupe_key in global_course_keys:
+            if dedupe_key in course_keys:
                 continue
 
-            global_course_keys.add(dedupe_key)
+            course_keys.add(dedupe_key)
             courses.append(course)
-            collected += 1
-            print(f"  Added course {collected}: {course['course_name']}")
+            print(f"  Added course {len(courses)} ({slug}): {course['course_name']}")
 
-        if collected < MIN_COURSES_PER_UNIVERSITY:
-            print(
-                f"  Warning: only {collected} courses were captured for {university_record['university_name']}."
-            )
+    if len(courses) < MIN_COURSES_PER_UNIVERSITY:
+        print(
+            f"  Warning: only {len(courses)} courses were captured for {university_record['university_name']}."
+        )
+
+    return university_record, courses
+
+
+def main():
+    print(f"Starting university and course scraping pipeline for {TARGET_COUNTRY}...")
+    session = build_session()
+
+    # Columns are accumulated as lists so the DataFrames are built without per-row dicts.
+    universities = {col: [] for col in UNIVERSITY_COLUMNS}
+    courses = {col: [] for col in COURSE_COLUMNS}
+
+    # Universities are scraped concurrently; results are merged in target order so IDs stay stable.
+    with ThreadPoolExecutor(max_workers=UNIVERSITY_WORKERS) as executor:
+        results = executor.map(
+            lambda item: process_university(session, *item),
+            enumerate(UNIVERSITY_TARGETS, start=1),
+        )
+        for university_record, university_courses in results:
+            if university_record:
+                for col in UNIVERSITY_COLUMNS:
+                    universities[col].append(university_record[col])
+            for course in university_courses:
+                for col in COURSE_COLUMNS:
+                    courses[col].append(course[col])
 
     universities_df = clean_universities(universities)
     courses_df = clean_courses(courses)
@@ -569,8 +706,8 @@ def main():
 
     # Keep only courses whose university_id exists in the universities sheet.
     valid_university_ids = set(universities_df["university_id"].tolist())
-    courses_df = courses_df[courses_df["university_id"].isin(valid_university_ids)].reset_index(drop=True)
-    courses_df["course_id"] = [f"C{i + 1:04d}" for i in range(len(courses_df))]
+    # IDs are assigned once, after filtering, so they stay sequential.
+    courses_df = assign_course_ids(courses_df[courses_df["university_id"].isin(valid_university_ids)])
 
     export_to_excel(universities_df, courses_df, OUTPUT_FILE)
 